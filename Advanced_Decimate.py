@@ -19,7 +19,21 @@ import bpy
 import numpy as np
 import time
 import mathutils
-import bmesh
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# SciPy ships with some Blender builds but not all, so it is optional.
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = None
+
+# Numba is optional too, it compiles the UV seam detection for very large meshes.
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+    prange = range
 
 # ============================================================
 #  REGISTRATION
@@ -42,68 +56,222 @@ bl_info = {
 def manage_uv_seams(obj, mark_seams=True):
     """
     Identifies and marks UV seams on a given object.
+    Works directly on the mesh data instead of going through edit mode.
     """
-    bpy.context.view_layer.objects.active = obj
+    # Pull pending edit-mode changes into the mesh instead of switching modes.
+    if obj.mode == 'EDIT':
+        obj.update_from_editmode()
 
-    if bpy.context.object.mode == 'EDIT':
-        bpy.ops.object.mode_set(mode='OBJECT')
-
-    # The operator works on the active UV map, so exit if it doesn't exist.
-    if not obj.data.uv_layers.active:
+    # The seams are detected on the active UV map, so exit if it doesn't exist or holds no UVs.
+    mesh = obj.data
+    if not mesh.uv_layers.active or len(mesh.uv_layers.active.data) == 0:
         return
 
-    # Mark the edges on the UV island borders to outline the seams.
+    # Mark the edges on the UV island borders to outline the seams, keeping the existing ones.
     if mark_seams:
-        bpy.ops.object.mode_set(mode='EDIT')
-        bpy.ops.mesh.select_all(action='SELECT')
-        bpy.ops.uv.seams_from_islands()
-        bpy.ops.object.mode_set(mode='OBJECT')
+        seams = np.empty(len(mesh.edges), dtype=bool)
+        mesh.edges.foreach_get('use_seam', seams)
+        mesh.edges.foreach_set('use_seam', seams | detect_uv_seams(mesh))
 
-def get_decimation_mapping_kdtree(source_obj_to_decimate, decimate_ratio, use_iterative=False):
+def detect_uv_seams(mesh, epsilon=1e-5, kernel_min_loops=2000000):
+    """
+    Returns a boolean mask of the edges that lie on UV island borders.
+    An edge is a border when the faces sharing it disagree on the UV
+    coordinate of one of its vertices by more than epsilon.
+    Meshes with at least kernel_min_loops loops use the Numba kernel if available.
+    """
+    loop_count = len(mesh.loops)
+    seam_mask = np.zeros(len(mesh.edges), dtype=bool)
+    if loop_count == 0:
+        return seam_mask
+
+    # Read the loop topology and UVs in bulk instead of walking the edges one by one.
+    loop_vert = np.empty(loop_count, dtype=np.int32)
+    loop_edge = np.empty(loop_count, dtype=np.int32)
+    loop_uv = np.empty(loop_count * 2, dtype=np.float32)
+    mesh.loops.foreach_get('vertex_index', loop_vert)
+    mesh.loops.foreach_get('edge_index', loop_edge)
+    mesh.uv_layers.active.data.foreach_get('uv', loop_uv)
+    loop_uv = loop_uv.reshape(-1, 2)
+
+    # A loop's edge runs from its own vertex to the vertex of the next loop in the face,
+    # so every loop provides a UV for both ends of its edge.
+    poly_count = len(mesh.polygons)
+    loop_start = np.empty(poly_count, dtype=np.int32)
+    loop_total = np.empty(poly_count, dtype=np.int32)
+    mesh.polygons.foreach_get('loop_start', loop_start)
+    mesh.polygons.foreach_get('loop_total', loop_total)
+    loop_next = np.arange(1, loop_count + 1, dtype=np.int32)
+    loop_next[loop_start + loop_total - 1] = loop_start
+
+    # Compiling the kernel takes longer than the NumPy path needs for most meshes,
+    # so it is only worth it for very large ones.
+    if njit is not None and loop_count >= kernel_min_loops:
+        return detect_uv_seams_kernel(loop_edge, loop_vert, loop_next, loop_uv, len(mesh.edges), epsilon * epsilon)
+
+    # Boundary edges belong to a single face and can't split the UVs, so leave them out before sorting.
+    edge_loop_count = np.bincount(loop_edge, minlength=len(mesh.edges))
+    interior_loops = np.flatnonzero(edge_loop_count[loop_edge] >= 2)
+    interior_next = loop_next[interior_loops]
+
+    corner_edge = np.concatenate((loop_edge[interior_loops], loop_edge[interior_loops]))
+    corner_vert = np.concatenate((loop_vert[interior_loops], loop_vert[interior_next]))
+    corner_uv = np.concatenate((loop_uv[interior_loops], loop_uv[interior_next]))
+
+    # Group the corners by edge and vertex, then compare the neighbouring UVs in each group.
+    order = np.lexsort((corner_vert, corner_edge))
+    corner_edge = corner_edge[order]
+    corner_vert = corner_vert[order]
+    corner_uv = corner_uv[order]
+
+    same_group = (np.diff(corner_edge) == 0) & (np.diff(corner_vert) == 0)
+    uv_delta = np.diff(corner_uv, axis=0)
+    uv_split = same_group & (np.einsum('ij,ij->i', uv_delta, uv_delta) > epsilon * epsilon)
+    seam_mask[corner_edge[1:][uv_split]] = True
+
+    return seam_mask
+
+def detect_uv_seams_kernel(loop_edge, loop_vert, loop_next, loop_uv, edge_count, epsilon_sq):
+    """
+    Compiled version of the UV seam detection, only used when Numba is available.
+    Buckets the loops by edge and compares the UVs of every pair of loops on an edge.
+    """
+    loop_count = loop_edge.shape[0]
+
+    # Bucket the loops by edge with a counting sort.
+    edge_start = np.zeros(edge_count + 1, dtype=np.int64)
+    for l in range(loop_count):
+        edge_start[loop_edge[l] + 1] += 1
+    for e in range(edge_count):
+        edge_start[e + 1] += edge_start[e]
+
+    edge_fill = edge_start[:-1].copy()
+    edge_loops = np.empty(loop_count, dtype=np.int64)
+    for l in range(loop_count):
+        e = loop_edge[l]
+        edge_loops[edge_fill[e]] = l
+        edge_fill[e] += 1
+
+    seam_mask = np.zeros(edge_count, dtype=np.bool_)
+    for e in prange(edge_count):
+        for i in range(edge_start[e], edge_start[e + 1]):
+            a = edge_loops[i]
+            a_next = loop_next[a]
+            for j in range(i + 1, edge_start[e + 1]):
+                b = edge_loops[j]
+                b_next = loop_next[b]
+
+                # Faces can run along the edge in either direction, so match the corners by vertex.
+                if loop_vert[a] != loop_vert[b]:
+                    b, b_next = b_next, b
+
+                du = loop_uv[a, 0] - loop_uv[b, 0]
+                dv = loop_uv[a, 1] - loop_uv[b, 1]
+                du_next = loop_uv[a_next, 0] - loop_uv[b_next, 0]
+                dv_next = loop_uv[a_next, 1] - loop_uv[b_next, 1]
+                if du * du + dv * dv > epsilon_sq or du_next * du_next + dv_next * dv_next > epsilon_sq:
+                    seam_mask[e] = True
+
+    return seam_mask
+
+if njit is not None:
+    # Caching needs a source file, which scripts run from the Text Editor don't have.
+    try:
+        detect_uv_seams_kernel = njit(parallel=True, fastmath=True, cache=True)(detect_uv_seams_kernel)
+    except RuntimeError:
+        detect_uv_seams_kernel = njit(parallel=True, fastmath=True)(detect_uv_seams_kernel)
+
+def get_vertex_coords(mesh):
+    """
+    Reads the positions of all the vertices of a mesh into an (N, 3) array.
+    """
+    coords = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get('co', coords)
+    return coords.reshape(-1, 3)
+
+def get_polygon_centers(mesh):
+    """
+    Computes the center of every polygon of a mesh as an (F, 3) array
+    by averaging the positions of its corners.
+    """
+    poly_count = len(mesh.polygons)
+    if poly_count == 0:
+        return np.empty((0, 3), dtype=np.float32)
+
+    # Only raw arrays are read, the per-polygon center property would be computed one face at a time.
+    loop_vert = np.empty(len(mesh.loops), dtype=np.int32)
+    loop_start = np.empty(poly_count, dtype=np.int32)
+    loop_total = np.empty(poly_count, dtype=np.int32)
+    mesh.loops.foreach_get('vertex_index', loop_vert)
+    mesh.polygons.foreach_get('loop_start', loop_start)
+    mesh.polygons.foreach_get('loop_total', loop_total)
+
+    corner_coords = get_vertex_coords(mesh)[loop_vert]
+    return np.add.reduceat(corner_coords, loop_start, axis=0) / loop_total[:, None].astype(np.float32)
+
+def find_nearest_indices(source_coords, query_coords):
+    """
+    Finds the index of the closest source point for every query point.
+    Uses a batched, multi-threaded SciPy query when available and falls
+    back to the mathutils KDTree otherwise.
+    """
+    if len(source_coords) == 0 or len(query_coords) == 0:
+        return np.zeros(len(query_coords), dtype=np.intp)
+
+    if cKDTree is not None:
+        tree = cKDTree(source_coords, leafsize=16, balanced_tree=True, compact_nodes=True)
+        _, indices = tree.query(query_coords, k=1, workers=-1)
+        return indices
+
+    kdtree = mathutils.kdtree.KDTree(len(source_coords))
+    for i, co in enumerate(source_coords):
+        kdtree.insert(co, i)
+    kdtree.balance()
+    return np.fromiter((kdtree.find(co)[1] for co in query_coords), dtype=np.intp, count=len(query_coords))
+
+def get_decimation_mapping_kdtree(source_obj_to_decimate, decimate_ratio, use_iterative=False, snap_every_n_steps=5, count_every_n_steps=10):
     """
     Get a precise vertex mapping using a KDTree and decimate the provided object.
-    If iterative decimation is enabled, the object will be decimated gradually.
+    If iterative decimation is enabled, the object will be decimated gradually
+    and snapped back to the original surface every few steps.
+    The mapping is an int32 array holding the original vertex index of every decimated vertex.
     """
-    # Build a KDTree from the object's vertex positions before it gets decimated.
+    # Store the object's vertex positions before it gets decimated.
     # This allows us to map the new vertices back to the original vertex indices.
-    source_vertex_count = len(source_obj_to_decimate.data.vertices)
-    kdtree = mathutils.kdtree.KDTree(source_vertex_count)
-    for i, v in enumerate(source_obj_to_decimate.data.vertices):
-        kdtree.insert(v.co, i)
-    kdtree.balance()
+    source_coords = get_vertex_coords(source_obj_to_decimate.data)
 
     # Need to clear the shape keys from the temporary object.
     if source_obj_to_decimate.data.shape_keys:
         source_obj_to_decimate.shape_key_clear()
 
-    if use_iterative:
-        # For iterative decimation, create a reference object to snap the vertices back to.
-        # This prevents the vertices from drifting away from the original surface over all the iterations.
-        bpy.ops.object.select_all(action='DESELECT')
-        bpy.context.view_layer.objects.active = source_obj_to_decimate
-        source_obj_to_decimate.select_set(True)
-        bpy.ops.object.duplicate(linked=False)
-        reference_obj = bpy.context.active_object
-        reference_obj.name = source_obj_to_decimate.name + "_reference"
-        reference_obj.hide_set(True)
-        
-        # Ensure we are operating on the correct object after duplication.
-        bpy.context.view_layer.objects.active = source_obj_to_decimate
+    # The modifier operators below work on the active object.
+    bpy.context.view_layer.objects.active = source_obj_to_decimate
 
+    if use_iterative:
         # Get the initial polygon count to use as a baseline for gradual decimation.
         initial_poly_count = len(source_obj_to_decimate.data.polygons)
+        # Without faces there is nothing to decimate, every vertex maps onto itself.
         if initial_poly_count == 0:
-            bpy.data.objects.remove(reference_obj, do_unlink=True)
-            return {}, source_obj_to_decimate
+            return np.arange(len(source_coords), dtype=np.int32), source_obj_to_decimate
+
+        # For iterative decimation, create a reference object to snap the vertices back to.
+        # This prevents the vertices from drifting away from the original surface over all the iterations.
+        # It is built from a copy of the mesh data, the duplicate operator would also change the selection.
+        reference_obj = bpy.data.objects.new(source_obj_to_decimate.name + "_reference", source_obj_to_decimate.data.copy())
+        reference_obj.matrix_world = source_obj_to_decimate.matrix_world
+        bpy.context.scene.collection.objects.link(reference_obj)
+        reference_obj.hide_set(True)
 
         # Gradually decimate the object in small steps for higher quality results.
         target_poly_count = int(initial_poly_count * decimate_ratio)
         current_poly_count = initial_poly_count
-        step = 0.01 
+        step = 0.01
+        step_count = 0
 
         while current_poly_count > target_poly_count:
             # Calculate the number of polygons to aim for in the next step.
-            polys_to_remove = int(initial_poly_count * step)
+            # Always remove at least one, or small meshes would never get closer to the target.
+            polys_to_remove = max(int(initial_poly_count * step), 1)
             next_target_poly_count = current_poly_count - polys_to_remove
 
             # Ensure we don't go below the final target.
@@ -117,57 +285,159 @@ def get_decimation_mapping_kdtree(source_obj_to_decimate, decimate_ratio, use_it
                 modifier_ratio = 0
 
             # Apply the decimation modifier.
-            bpy.context.view_layer.objects.active = source_obj_to_decimate
             mod = source_obj_to_decimate.modifiers.new(name="Decimate", type='DECIMATE')
             mod.ratio = modifier_ratio
             mod.delimit = {'SEAM'}
             bpy.ops.object.modifier_apply(modifier=mod.name)
-
-            # After each decimation step, snap the vertices back to the original surface.
-            shrinkwrap_mod = source_obj_to_decimate.modifiers.new(name="Shrinkwrap", type='SHRINKWRAP')
-            shrinkwrap_mod.target = reference_obj
-            shrinkwrap_mod.wrap_method = 'NEAREST_SURFACEPOINT'
-            bpy.ops.object.modifier_apply(modifier=shrinkwrap_mod.name)
+            step_count += 1
 
             # Update the current polygon count for the next iteration.
-            current_poly_count = len(source_obj_to_decimate.data.polygons)
-        
-        # Clean up the reference object, we don't need it anymore.
+            # Assume the step hit its target and only read the real count every few steps,
+            # or when the target seems to be reached, so the estimate can't drift for long.
+            current_poly_count = next_target_poly_count
+            if step_count % count_every_n_steps == 0 or current_poly_count <= target_poly_count:
+                current_poly_count = len(source_obj_to_decimate.data.polygons)
+
+            # Snap the vertices back to the original surface every few steps, and always after the last one.
+            # The drift between snaps is small, and every skipped snap saves a full modifier apply.
+            if step_count % snap_every_n_steps == 0 or current_poly_count <= target_poly_count:
+                shrinkwrap_mod = source_obj_to_decimate.modifiers.new(name="Shrinkwrap", type='SHRINKWRAP')
+                shrinkwrap_mod.target = reference_obj
+                shrinkwrap_mod.wrap_method = 'NEAREST_SURFACEPOINT'
+                bpy.ops.object.modifier_apply(modifier=shrinkwrap_mod.name)
+
+        # Clean up the reference object along with its mesh, we don't need them anymore.
+        reference_mesh = reference_obj.data
         bpy.data.objects.remove(reference_obj, do_unlink=True)
+        bpy.data.meshes.remove(reference_mesh)
     else:
         # Perform a single, direct decimation.
-        bpy.context.view_layer.objects.active = source_obj_to_decimate
         mod = source_obj_to_decimate.modifiers.new(name="Decimate", type='DECIMATE')
         mod.ratio = decimate_ratio
         mod.delimit = {'SEAM'}
         bpy.ops.object.modifier_apply(modifier=mod.name)
 
-    # Map each new vertex to its closest original vertex using the KDTree.
-    vertex_mapping = {}
-    for i, v_dec in enumerate(source_obj_to_decimate.data.vertices):
-        co, index, dist = kdtree.find(v_dec.co)
-        vertex_mapping[i] = index
+    # Map each new vertex to its closest original vertex with a single batched query.
+    decimated_coords = get_vertex_coords(source_obj_to_decimate.data)
+    # Vertex indices always fit in 32 bits, which halves the size of the mapping.
+    vertex_mapping = find_nearest_indices(source_coords, decimated_coords).astype(np.int32)
 
     return vertex_mapping, source_obj_to_decimate
 
 def apply_decimation_mapping_to_shape_key(shape_key_verts, vertex_mapping):
     """
-    Apply the decimation mapping to a single shape key's vertex data.
+    Apply the decimation mapping to shape key vertex data, either a single
+    key of shape (N, 3) or a stack of keys of shape (K, N, 3).
+    The mapping holds the original vertex index for every decimated vertex.
     """
-    if not vertex_mapping:
-        return np.array([])
-        
-    decimated_verts_count = max(vertex_mapping.keys()) + 1
-    decimated_verts = np.zeros((decimated_verts_count, 3), dtype=np.float32)
-    
-    # Map the decimated vertices to the original vertices.
-    for decimated_idx, original_idx in vertex_mapping.items():
-        if original_idx < len(shape_key_verts):
-            decimated_verts[decimated_idx] = shape_key_verts[original_idx]
-    
+    if vertex_mapping.size == 0:
+        return shape_key_verts[..., :0, :]
+
+    # Gather the decimated vertices from the original vertices in a single pass.
+    # The data type is kept so half precision offsets stay compact until they are written.
+    valid = vertex_mapping < shape_key_verts.shape[-2]
+    if valid.all():
+        return shape_key_verts[..., vertex_mapping, :]
+
+    # Vertices without a valid original are left at zero.
+    decimated_verts = np.zeros(shape_key_verts.shape[:-2] + (vertex_mapping.size, 3), dtype=shape_key_verts.dtype)
+    decimated_verts[..., valid, :] = shape_key_verts[..., vertex_mapping[valid], :]
     return decimated_verts
 
-def rebuild_data_on_decimated_object(source_obj, final_obj, shape_key_geometry, key_names, vertex_mapping, shape_key_values):
+def get_shape_key_offsets(shape_key_geometry, tolerance=1e-3):
+    """
+    Turns a (K, N, 3) stack of shape key coordinates into the offsets of every
+    key from the first one. The offsets are stored in half precision unless
+    that would move a vertex by more than the tolerance, in scene units.
+    Half precision keeps offsets up to four units within the default tolerance.
+    """
+    shape_key_geometry -= shape_key_geometry[0].copy()
+
+    # Check every key on its own first, so the half precision stack is only allocated once it is known to be kept.
+    float16_max = np.finfo(np.float16).max
+    for offsets in shape_key_geometry:
+        # Offsets outside the half precision range would overflow, so don't even try to convert them.
+        if np.abs(offsets).max(initial=0.0) >= float16_max:
+            return shape_key_geometry
+
+        rounding_error = np.abs(offsets.astype(np.float16).astype(np.float32) - offsets).max(initial=0.0)
+        if not rounding_error <= tolerance:
+            return shape_key_geometry
+
+    # Most offsets are small or zero, so half precision keeps them intact at half the memory.
+    return shape_key_geometry.astype(np.float16)
+
+def transfer_vertex_groups(source_obj, final_obj, vertex_mapping, modifier_min_verts=20000):
+    """
+    Copies the vertex groups onto the final object by gathering the weights
+    of the original vertices through the decimation mapping.
+    Meshes with at least modifier_min_verts vertices use the Data Transfer modifier instead.
+    """
+    # The weights can only be read and written a vertex at a time from Python,
+    # so on large meshes the modifier doing the whole transfer in C is faster.
+    if len(source_obj.data.vertices) >= modifier_min_verts:
+        transfer_vertex_groups_modifier(source_obj, final_obj)
+        return
+
+    # Start from a clean slate, the decimated copy carries over interpolated groups.
+    final_obj.vertex_groups.clear()
+
+    # Collect every (vertex, group, weight) entry of the source mesh in a single pass.
+    # There is no bulk accessor for vertex group weights, so this is the only Python loop.
+    entry_verts = []
+    entry_groups = []
+    entry_weights = []
+    for vert_index, vert in enumerate(source_obj.data.vertices):
+        for group in vert.groups:
+            entry_verts.append(vert_index)
+            entry_groups.append(group.group)
+            entry_weights.append(group.weight)
+    entry_verts = np.array(entry_verts, dtype=np.int32)
+    entry_groups = np.array(entry_groups, dtype=np.int32)
+    entry_weights = np.array(entry_weights, dtype=np.float32)
+
+    source_weights = np.zeros(len(source_obj.data.vertices), dtype=np.float32)
+    for source_group in source_obj.vertex_groups:
+        final_group = final_obj.vertex_groups.new(name=source_group.name)
+        final_group.lock_weight = source_group.lock_weight
+        if vertex_mapping.size == 0:
+            continue
+
+        # Spread the group's weights over the source vertices, then gather them for the decimated ones.
+        in_group = entry_groups == source_group.index
+        source_weights.fill(0.0)
+        source_weights[entry_verts[in_group]] = entry_weights[in_group]
+        decimated_weights = source_weights[vertex_mapping]
+
+        # Vertices that share a weight are added together, one call per distinct weight.
+        assigned = np.flatnonzero(decimated_weights > 0.0)
+        if assigned.size == 0:
+            continue
+        assigned = assigned[np.argsort(decimated_weights[assigned], kind='stable')]
+        assigned_weights = decimated_weights[assigned]
+        run_starts = np.concatenate(([0], np.flatnonzero(np.diff(assigned_weights)) + 1))
+        for run_verts, weight in zip(np.split(assigned, run_starts[1:]), assigned_weights[run_starts]):
+            final_group.add(run_verts.tolist(), float(weight), 'REPLACE')
+
+def transfer_vertex_groups_modifier(source_obj, final_obj):
+    """
+    Copies the vertex groups onto the final object, which must be the active object,
+    with a Data Transfer modifier interpolating the weights from the nearest face.
+    """
+    vg_data_transfer_mod = final_obj.modifiers.new(name="VGroupTransfer", type='DATA_TRANSFER')
+    vg_data_transfer_mod.object = source_obj
+    vg_data_transfer_mod.use_vert_data = True
+    vg_data_transfer_mod.data_types_verts = {'VGROUP_WEIGHTS'}
+    vg_data_transfer_mod.vert_mapping = 'POLYINTERP_NEAREST'
+    vg_data_transfer_mod.layers_vgroup_select_src = 'ALL'
+    vg_data_transfer_mod.layers_vgroup_select_dst = 'NAME'
+
+    # The weights have no bulk accessor, so reading them back from the evaluated mesh
+    # would bring back the per-vertex loop. Apply the modifier instead.
+    bpy.ops.object.datalayout_transfer(modifier=vg_data_transfer_mod.name)
+    bpy.ops.object.modifier_apply(modifier=vg_data_transfer_mod.name)
+
+def rebuild_data_on_decimated_object(source_obj, final_obj, shape_key_offsets, key_names, vertex_mapping, shape_key_values):
     """
     Rebuilds all the data (shape keys, materials, etc.) onto the final object
     using the decimation mapping and data from the source object.
@@ -176,107 +446,118 @@ def rebuild_data_on_decimated_object(source_obj, final_obj, shape_key_geometry,
     """
     # Rename the decimated object to be more descriptive.
     final_obj.name = source_obj.name + "_Decimated"
-    
-    # Ran into some projection issues, need to align the new object to the source object.
+
+    # Set the parent and transforms once, up front.
+    # Ran into some projection issues, the new object needs to be aligned to the source object for the transfers.
+    if source_obj.parent:
+        final_obj.parent = source_obj.parent
+        final_obj.parent_type = source_obj.parent_type
     final_obj.matrix_world = source_obj.matrix_world
-    
-    # Set origin to 0,0,0, avoids issues with transforms.
-    final_obj.location = (0, 0, 0)  
+
+    # Make the final object the active, selected one for the rest of the rebuild.
+    bpy.context.view_layer.objects.active = final_obj
+    final_obj.select_set(True)
+
+    # Start the data transfer process.
+    # I think the Data Transfer modifier needs the source object to be visible.
+    source_obj.hide_set(False)
+
+    # Transfer the custom normals, there is nothing to transfer if the source doesn't have any.
+    # This runs before the shape keys are rebuilt, so the evaluated mesh is the rest shape and not a shape key mix.
+    if source_obj.data.has_custom_normals:
+        cn_data_transfer_mod = final_obj.modifiers.new(name="NormalTransfer", type='DATA_TRANSFER')
+        cn_data_transfer_mod.object = source_obj
+        cn_data_transfer_mod.use_loop_data = True
+        cn_data_transfer_mod.data_types_loops = {'CUSTOM_NORMAL'}
+        cn_data_transfer_mod.loop_mapping = 'NEAREST_POLYNOR'
+
+        # Evaluate the modifier through the depsgraph and write the resulting normals back,
+        # this avoids the layout and apply operators along with their scene updates.
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+        eval_obj = final_obj.evaluated_get(depsgraph)
+        eval_mesh = eval_obj.to_mesh()
+        if hasattr(eval_mesh, 'calc_normals_split'):
+            eval_mesh.calc_normals_split()
+        loop_normals = np.empty(len(eval_mesh.loops) * 3, dtype=np.float32)
+        eval_mesh.loops.foreach_get('normal', loop_normals)
+        eval_obj.to_mesh_clear()
+
+        final_obj.modifiers.remove(cn_data_transfer_mod)
+        final_obj.data.normals_split_custom_set(loop_normals.reshape(-1, 3))
 
     # Recreate shape keys using the precise mapping.
     if key_names:
-        for i, name in enumerate(key_names):
-            shape_key_verts = shape_key_geometry[name]
-            new_key = final_obj.shape_key_add(name=name, from_mix=(i == 0)) 
-            
-            decimated_verts = apply_decimation_mapping_to_shape_key(shape_key_verts, vertex_mapping)
-            
-            if decimated_verts.size > 0:
-                new_key.data.foreach_set('co', decimated_verts.ravel())
+        # Build on the decimated positions rather than snapping the basis to the nearest original vertices.
+        # Only the offsets of each key are carried over through the mapping.
+        decimated_basis = get_vertex_coords(final_obj.data)
+
+        def remap_shape_key(i):
+            # Add straight into a fresh contiguous float32 buffer, foreach_set can then copy it in one go
+            # instead of converting every element.
+            decimated_offsets = apply_decimation_mapping_to_shape_key(shape_key_offsets[i], vertex_mapping)
+            decimated_verts = np.add(decimated_basis, decimated_offsets, dtype=np.float32)
+            return np.ascontiguousarray(decimated_verts).reshape(-1)
+
+        # NumPy releases the GIL while gathering, so the keys are remapped on worker threads
+        # while the main thread hands the finished ones over to Blender.
+        # Only a small window of keys is submitted ahead, so the results never pile up in memory.
+        max_workers = 4
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = deque()
+            next_key = 0
+            for i, name in enumerate(key_names):
+                while next_key < len(key_names) and len(pending) < max_workers * 2:
+                    pending.append(executor.submit(remap_shape_key, next_key))
+                    next_key += 1
+
+                new_key = final_obj.shape_key_add(name=name, from_mix=(i == 0))
+                decimated_verts = pending.popleft().result()
+
+                if decimated_verts.size > 0:
+                    new_key.data.foreach_set('co', decimated_verts)
                 
         # Restore the original shape key values.
+        # The keys were added in the source order, so the values line up by position.
         if final_obj.data.shape_keys:
             final_keys = final_obj.data.shape_keys.key_blocks
-            for name, value in shape_key_values.items():
-                if name in final_keys:
-                    final_keys[name].value = value
+            if len(final_keys) == len(shape_key_values):
+                final_keys.foreach_set('value', shape_key_values)
     
-    # Start the data transfer process.
-    # I think the Data Transfer modifier needs the source object to be visible.
-    source_obj.hide_set(False)
-    bpy.context.view_layer.objects.active = final_obj
-    final_obj.select_set(True)
-
-    # Transfer the vertex groups.
-    vg_data_transfer_mod = final_obj.modifiers.new(name="VGroupTransfer", type='DATA_TRANSFER')
-    vg_data_transfer_mod.object = source_obj
-    vg_data_transfer_mod.use_vert_data = True
-    vg_data_transfer_mod.data_types_verts = {'VGROUP_WEIGHTS'}
-    vg_data_transfer_mod.vert_mapping = 'POLYINTERP_NEAREST'
-    vg_data_transfer_mod.layers_vgroup_select_src = 'ALL'
-    vg_data_transfer_mod.layers_vgroup_select_dst = 'NAME'
-    bpy.ops.object.datalayout_transfer(modifier=vg_data_transfer_mod.name)
-    bpy.ops.object.modifier_apply(modifier=vg_data_transfer_mod.name)
+    # Transfer the vertex groups, skipping the pass over the source vertices if there are none.
+    if source_obj.vertex_groups:
+        transfer_vertex_groups(source_obj, final_obj, vertex_mapping)
   
     # Clear all seams from the final mesh as they will not line up with the new topology.
-    bpy.context.view_layer.objects.active = final_obj
-    bpy.ops.object.mode_set(mode='EDIT')
-    bpy.ops.mesh.select_all(action='SELECT')
-    bpy.ops.mesh.mark_seam(clear=True)
-    bpy.ops.object.mode_set(mode='OBJECT')
+    # Writing the edge flags directly avoids the edit mode round trip and its operators.
+    final_obj.data.edges.foreach_set('use_seam', np.zeros(len(final_obj.data.edges), dtype=bool))
   
-    # Transfer the custom normals.
-    cn_data_transfer_mod = final_obj.modifiers.new(name="NormalTransfer", type='DATA_TRANSFER')
-    cn_data_transfer_mod.object = source_obj
-    cn_data_transfer_mod.use_loop_data = True
-    cn_data_transfer_mod.data_types_loops = {'CUSTOM_NORMAL'}
-    cn_data_transfer_mod.loop_mapping = 'NEAREST_POLYNOR'
-    bpy.ops.object.datalayout_transfer(modifier=cn_data_transfer_mod.name)
-    bpy.ops.object.modifier_apply(modifier=cn_data_transfer_mod.name)
-    bpy.ops.object.mode_set(mode='OBJECT')
-
     # Link the materials from the source object.
-    bpy.context.view_layer.objects.active = source_obj
-    bpy.ops.object.make_links_data(type='MATERIAL')
-    bpy.context.view_layer.objects.active = final_obj
+    final_obj.data.materials.clear()
+    for material in source_obj.data.materials:
+        final_obj.data.materials.append(material)
+
+    # Slots linked to the object rather than the mesh need to be copied separately.
+    for slot_index, slot in enumerate(source_obj.material_slots):
+        if slot.link == 'OBJECT':
+            final_obj.material_slots[slot_index].link = 'OBJECT'
+            final_obj.material_slots[slot_index].material = slot.material
 
     # Transfer the material assignments.
-    source_bm = bmesh.new()
-    source_bm.from_mesh(source_obj.data)
-    source_bm.transform(source_obj.matrix_world) 
-
-    # Iterate through the source object's faces and build a KDTree of their centers.
-    poly_count = len(source_bm.faces)
-    kd = mathutils.kdtree.KDTree(poly_count)
-    for i, face in enumerate(source_bm.faces):
-        kd.insert(face.calc_center_median(), i)
-    kd.balance()
-
-    # Get the target BMesh.
-    target_bm = bmesh.new()
-    target_bm.from_mesh(final_obj.data)
-    target_bm.transform(final_obj.matrix_world)
-    target_bm.faces.ensure_lookup_table()
-    source_bm.faces.ensure_lookup_table()
-
-    # For each target face, find the closest source face and copy its material index and smooth flag.
-    for face in target_bm.faces:
-        co, index, dist = kd.find(face.calc_center_median())
-        if index is not None:
-            source_face = source_bm.faces[index]
-            face.material_index = source_face.material_index
-            face.smooth = source_face.smooth
-
-    # Write the changes back to the mesh and clean up BMesh data.
-    target_bm.to_mesh(final_obj.data)
-    source_bm.free()
-    target_bm.free()
-
-    # Set the parent and transforms.
-    if source_obj.parent:
-        final_obj.parent = source_obj.parent
-        final_obj.parent_type = source_obj.parent_type
-    final_obj.matrix_world = source_obj.matrix_world
+    # Read the face centers of both meshes in bulk and match them with one batched query.
+    # The decimated mesh comes from a copy of the source mesh, so both share the same local space.
+    source_centers = get_polygon_centers(source_obj.data)
+    target_centers = get_polygon_centers(final_obj.data)
+    nearest_faces = find_nearest_indices(source_centers, target_centers)
+
+    # For each target face, copy the material index and smooth flag of the closest source face.
+    source_poly_count = len(source_obj.data.polygons)
+    if source_poly_count > 0:
+        source_material_indices = np.empty(source_poly_count, dtype=np.int32)
+        source_smooth = np.empty(source_poly_count, dtype=bool)
+        source_obj.data.polygons.foreach_get('material_index', source_material_indices)
+        source_obj.data.polygons.foreach_get('use_smooth', source_smooth)
+        final_obj.data.polygons.foreach_set('material_index', source_material_indices[nearest_faces])
+        final_obj.data.polygons.foreach_set('use_smooth', source_smooth[nearest_faces])
 
     # Recreate the armature modifier if it exists.
     for mod in source_obj.modifiers:
@@ -318,8 +599,8 @@ class OBJECT_OT_advanced_decimate(bpy.types.Operator):
             return {'CANCELLED'}
 
         # Ensure the original object is the only one selected to avoid duplicating others.
+        # It is already the active object, so only the selection needs to change.
         bpy.ops.object.select_all(action='DESELECT')
-        bpy.context.view_layer.objects.active = source_obj
         source_obj.select_set(True)
 
         # Create a full, unlinked duplicate of the source object to work on.
@@ -332,21 +613,25 @@ class OBJECT_OT_advanced_decimate(bpy.types.Operator):
         manage_uv_seams(source_copy_obj, mark_seams=True)
         
         shape_keys = source_obj.data.shape_keys
-        shape_key_geometry = {}
+        shape_key_offsets = np.empty((0, 0, 3), dtype=np.float32)
         key_names = []
-        shape_key_values = {}
+        shape_key_values = np.empty(0, dtype=np.float32)
 
         if shape_keys:
-            key_names = [key.name for key in shape_keys.key_blocks]
-            
-            # Directly read the absolute vertex coordinates from each shape key block.
-            for key_block in source_obj.data.shape_keys.key_blocks:
-                name = key_block.name
-                shape_key_values[name] = key_block.value
-                vertex_count = len(key_block.data)
-                coords = np.empty(vertex_count * 3, dtype=np.float32)
-                key_block.data.foreach_get('co', coords)
-                shape_key_geometry[name] = coords.reshape(-1, 3)
+            key_blocks = shape_keys.key_blocks
+            key_names = [key.name for key in key_blocks]
+            shape_key_values = np.empty(len(key_blocks), dtype=np.float32)
+            key_blocks.foreach_get('value', shape_key_values)
+
+            # Directly read the absolute vertex coordinates of every shape key into one (K, N, 3) block.
+            vertex_count = len(source_obj.data.vertices)
+            shape_key_geometry = np.empty((len(key_blocks), vertex_count, 3), dtype=np.float32)
+            for i, key_block in enumerate(key_blocks):
+                key_block.data.foreach_get('co', shape_key_geometry[i].reshape(-1))
+
+            # Keep the shape keys as compact offsets from the first key until they are rebuilt.
+            shape_key_offsets = get_shape_key_offsets(shape_key_geometry)
+            del shape_key_geometry
         else:
             print("INFO: No shape keys found on the selected object. Proceeding without shape key data.")
 
@@ -355,7 +640,7 @@ class OBJECT_OT_advanced_decimate(bpy.types.Operator):
         vertex_mapping, decimated_obj = get_decimation_mapping_kdtree(source_copy_obj, decimate_ratio, use_iterative)
         print(f"INFO: Decimation complete! Mapped {len(source_copy_obj.data.vertices)} source vertices to {len(decimated_obj.data.vertices)} decimated vertices.")
 
-        final_obj = rebuild_data_on_decimated_object(source_obj, decimated_obj, shape_key_geometry, key_names, vertex_mapping, shape_key_values)
+        final_obj = rebuild_data_on_decimated_object(source_obj, decimated_obj, shape_key_offsets, key_names, vertex_mapping, shape_key_values)
 
         print(f"INFO: Advanced decimation complete in {time.time() - start_time:.2f} seconds!")
         self.report({'INFO'}, f"Generated: '{final_obj.name}'")